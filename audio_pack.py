@@ -0,0 +1,276 @@
+import os
+import json
+import glob
+import logging
+import argparse
+import numpy as np
+import torch
+import torchaudio
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+INDEX_FILE = "index.json"
+SUPPORTED_DTYPES = ("float16", "int16")
+
+class AudioPack:
+    """已解码并重采样到目标采样率的音频包，按分片存储为内存映射数组"""
+
+    def __init__(self, pack_dir, target_sample_rate=16000, dtype=None, shard_size_mb=1024, compact_ratio=0.5):
+        self.pack_dir = pack_dir
+        self.target_sample_rate = target_sample_rate
+        self.dtype = dtype
+        self.shard_size_mb = shard_size_mb
+        self.compact_ratio = compact_ratio
+        self.shards = []
+        self.entries = {}
+        self._memmaps = {}
+        self._load_index()
+        if self.dtype is None:
+            self.dtype = "float16"
+
+    def _load_index(self):
+        index_path = os.path.join(self.pack_dir, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+
+        if index["sample_rate"] != self.target_sample_rate:
+            raise ValueError(f"音频包采样率为 {index['sample_rate']}，与目标采样率 {self.target_sample_rate} 不一致")
+
+        if self.dtype is not None and index["dtype"] != self.dtype:
+            raise ValueError(f"音频包数据类型为 {index['dtype']}，与指定的数据类型 {self.dtype} 不一致")
+
+        self.dtype = index["dtype"]
+        self.shards = index["shards"]
+        self.entries = index["entries"]
+
+    def _save_index(self):
+        os.makedirs(self.pack_dir, exist_ok=True)
+        index_path = os.path.join(self.pack_dir, INDEX_FILE)
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "sample_rate": self.target_sample_rate,
+                "dtype": self.dtype,
+                "shards": self.shards,
+                "entries": self.entries
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, index_path)
+
+    @staticmethod
+    def _key(audio_path):
+        return os.path.normcase(os.path.abspath(audio_path))
+
+    @staticmethod
+    def _stat(audio_path):
+        stat = os.stat(audio_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def is_fresh(self, audio_path):
+        entry = self.entries.get(self._key(audio_path))
+        if entry is None:
+            return False
+        try:
+            mtime_ns, size = self._stat(audio_path)
+        except OSError:
+            return False
+        return entry["mtime_ns"] == mtime_ns and entry["size"] == size
+
+    def _decode(self, audio_path):
+        waveform, sample_rate = torchaudio.load(audio_path)
+        if sample_rate != self.target_sample_rate:
+            waveform = torchaudio.functional.resample(waveform, sample_rate, self.target_sample_rate)
+        # 参考音频按单声道存储
+        waveform = waveform.mean(dim=0).numpy()
+        if self.dtype == "int16":
+            return (np.clip(waveform, -1.0, 1.0) * 32767).astype(np.int16)
+        return waveform.astype(np.float16)
+
+    def update(self, folder_path):
+        """增量打包：仅解码新增或修改过的文件，已删除的文件从索引中移除"""
+        if self.dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"不支持的数据类型: {self.dtype}")
+
+        audio_paths = glob.glob(os.path.join(folder_path, '**', '*.wav'), recursive=True)
+        folder_key = self._key(folder_path)
+        present_keys = {self._key(path) for path in audio_paths}
+        removed_keys = [key for key in self.entries
+                        if key.startswith(folder_key + os.sep) and key not in present_keys]
+        for key in removed_keys:
+            del self.entries[key]
+        self._drop_missing_shards()
+
+        pending = [path for path in audio_paths if not self.is_fresh(path)]
+        logging.info(f"找到 {len(audio_paths)} 个音频文件，需要打包 {len(pending)} 个，移除 {len(removed_keys)} 个")
+
+        packed_count = self._append(self._decode_pending(pending))
+        self._drop_unused_shards()
+        self._save_index()
+        logging.info(f"打包完成，共写入 {packed_count} 个文件到 {self.pack_dir}")
+
+        self.compact()
+        return packed_count
+
+    def _decode_pending(self, pending):
+        for audio_path in pending:
+            try:
+                mtime_ns, size = self._stat(audio_path)
+                samples = self._decode(audio_path)
+            except Exception as e:
+                logging.error(f"解码音频时出错 {audio_path}: {e}")
+                continue
+
+            if len(samples) == 0:
+                logging.warning(f"跳过空音频: {audio_path}")
+                continue
+
+            yield self._key(audio_path), samples, mtime_ns, size
+
+    def _new_shard_name(self):
+        # 分片编号只增不减，避免与仍在使用的分片重名
+        shard_id = max((int(name[len("shard_"):-len(".bin")]) for name in self.shards), default=-1) + 1
+        while os.path.exists(os.path.join(self.pack_dir, f"shard_{shard_id:05d}.bin")):
+            shard_id += 1
+        return f"shard_{shard_id:05d}.bin"
+
+    def _append(self, items):
+        """将 (索引键, 采样点, mtime_ns, size) 依次写入新分片，返回写入的文件数"""
+        os.makedirs(self.pack_dir, exist_ok=True)
+        shard_limit = self.shard_size_mb * 1024 * 1024
+        shard_file = None
+        shard_name = None
+        offset = 0
+        count = 0
+
+        try:
+            for key, samples, mtime_ns, size in items:
+                if shard_file is None:
+                    shard_name = self._new_shard_name()
+                    shard_file = open(os.path.join(self.pack_dir, shard_name), 'xb')
+                    self.shards.append(shard_name)
+                    offset = 0
+
+                shard_file.write(samples.tobytes())
+                self.entries[key] = {
+                    "shard": shard_name,
+                    "offset": offset,
+                    "length": len(samples),
+                    "mtime_ns": mtime_ns,
+                    "size": size
+                }
+                offset += len(samples)
+                count += 1
+
+                if offset * samples.itemsize >= shard_limit:
+                    shard_file.close()
+                    shard_file = None
+                    # 每写完一个分片就落盘索引，中断后已完成的分片仍可复用
+                    self._save_index()
+        finally:
+            if shard_file is not None:
+                shard_file.close()
+
+        return count
+
+    def compact(self):
+        """重写失效数据占比超过 compact_ratio 的分片，回收已修改或已删除文件占用的空间"""
+        self._drop_missing_shards()
+        itemsize = np.dtype(self.dtype).itemsize
+        live_samples = {}
+        for entry in self.entries.values():
+            live_samples[entry["shard"]] = live_samples.get(entry["shard"], 0) + entry["length"]
+
+        compact_shards = set()
+        for shard_name in self.shards:
+            total_samples = os.path.getsize(os.path.join(self.pack_dir, shard_name)) // itemsize
+            if total_samples and 1 - live_samples.get(shard_name, 0) / total_samples > self.compact_ratio:
+                compact_shards.add(shard_name)
+
+        if not compact_shards:
+            return 0
+
+        moved_items = [(key, entry) for key, entry in self.entries.items() if entry["shard"] in compact_shards]
+        logging.info(f"压缩 {len(compact_shards)} 个分片，迁移 {len(moved_items)} 个文件")
+        moved_count = self._append(
+            (key, np.array(self._memmap(entry["shard"])[entry["offset"]:entry["offset"] + entry["length"]]), entry["mtime_ns"], entry["size"])
+            for key, entry in moved_items
+        )
+        self._drop_unused_shards()
+        self._save_index()
+        return moved_count
+
+    def _drop_missing_shards(self):
+        """移除磁盘上已不存在的分片及其索引项，对应文件会在下次打包时重新解码"""
+        missing_shards = {name for name in self.shards if not os.path.exists(os.path.join(self.pack_dir, name))}
+        if not missing_shards:
+            return
+
+        for shard_name in missing_shards:
+            logging.error(f"分片文件不存在，将重新打包其中的音频: {shard_name}")
+            self.shards.remove(shard_name)
+            self._memmaps.pop(shard_name, None)
+        for key in [key for key, entry in self.entries.items() if entry["shard"] in missing_shards]:
+            del self.entries[key]
+
+    def _drop_unused_shards(self):
+        used_shards = {entry["shard"] for entry in self.entries.values()}
+        for shard_name in [name for name in self.shards if name not in used_shards]:
+            self.shards.remove(shard_name)
+            self._memmaps.pop(shard_name, None)
+            try:
+                os.remove(os.path.join(self.pack_dir, shard_name))
+                logging.info(f"删除未使用的分片: {shard_name}")
+            except OSError as e:
+                logging.error(f"删除分片时出错: {e}")
+
+    def _memmap(self, shard_name):
+        if shard_name not in self._memmaps:
+            self._memmaps[shard_name] = np.memmap(os.path.join(self.pack_dir, shard_name), dtype=self.dtype, mode='r')
+        return self._memmaps[shard_name]
+
+    def load(self, audio_path):
+        """返回形状为 (1, N) 的 float32 波形；文件不在包中或已修改时返回 None"""
+        if not self.is_fresh(audio_path):
+            return None
+
+        entry = self.entries[self._key(audio_path)]
+        samples = self._memmap(entry["shard"])[entry["offset"]:entry["offset"] + entry["length"]]
+        waveform = torch.from_numpy(samples.astype(np.float32))
+        if self.dtype == "int16":
+            waveform /= 32767
+        return waveform.unsqueeze(0)
+
+def open_pack(pack_dir, target_sample_rate=16000):
+    """打开已有的音频包用于读取，索引不存在时报错而不是静默回退到逐个解码"""
+    if not os.path.exists(os.path.join(pack_dir, INDEX_FILE)):
+        raise FileNotFoundError(f"音频包索引不存在: {os.path.join(pack_dir, INDEX_FILE)}，请先运行 audio_pack.py 打包")
+    return AudioPack(pack_dir, target_sample_rate)
+
+def load_waveform(audio_path, pack=None, target_sample_rate=16000, device='cpu'):
+    """优先从音频包读取波形，未打包或已修改的文件回退到解码+重采样"""
+    if pack is not None:
+        waveform = pack.load(audio_path)
+        if waveform is not None:
+            return waveform
+
+    # 与音频包一致，按单声道输入模型
+    waveform, sample_rate = torchaudio.load(audio_path)
+    waveform = waveform.mean(dim=0, keepdim=True)
+    if sample_rate != target_sample_rate:
+        resampler = torchaudio.transforms.Resample(orig_freq=sample_rate, new_freq=target_sample_rate).to(device)
+        waveform = resampler(waveform.to(device))
+    return waveform
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='将音频预解码并重采样后打包，供识别时直接读取')
+    parser.add_argument('--folder_path', type=str, required=True, help='包含音频文件的文件夹路径')
+    parser.add_argument('--pack_dir', type=str, required=True, help='音频包的保存路径')
+    parser.add_argument('--dtype', choices=SUPPORTED_DTYPES, default=None, help='存储的数据类型，新建音频包时默认为float16，已有音频包沿用其数据类型')
+    parser.add_argument('--shard_size_mb', type=int, default=1024, help='单个分片的大小(MB)')
+    parser.add_argument('--compact_ratio', type=float, default=0.5, help='分片中失效数据占比超过该值时重写该分片')
+    args = parser.parse_args()
+
+    pack = AudioPack(args.pack_dir, dtype=args.dtype, shard_size_mb=args.shard_size_mb, compact_ratio=args.compact_ratio)
+    pack.update(args.folder_path)
@@ -68,6 +68,10 @@ async def classify_audio_emotion(log_file, output_path, max_workers=4):
         if "TextEmotion" in header:
             text_emotion_index = header.index("TextEmotion")
         
+        skip_reason_index = None
+        if "SkipReason" in header:
+            skip_reason_index = header.index("SkipReason")
+
         audio_path_index = header.index("AudioPath")
         audio_emotion_index = header.index("AudioEmotion")
         
@@ -75,6 +79,10 @@ async def classify_audio_emotion(log_file, output_path, max_workers=4):
             futures = []
             for row in reader:
                 audio_path = row[audio_path_index]
+                if skip_reason_index is not None and row[skip_reason_index]:
+                    logging.info(f"跳过 {audio_path},原因: {row[skip_reason_index]}")
+                    continue
+
                 audio_emotion = row[audio_emotion_index]
                 character = row[3] if len(row) > 3 else "Unknown"
                 text_emotion = row[text_emotion_index] if text_emotion_index is not None else None
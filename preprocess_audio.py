@@ -4,6 +4,8 @@ import argparse
 from pydub import AudioSegment
 import glob
 import re
+import numpy as np
+from silence import detect_speech
 
 # 设置日志格式
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -87,8 +89,18 @@ def rename_wav_with_list(list_file, wav_folder):
     logging.info(f"共重命名了 {renamed_count} 个文件")
     return renamed_count
 
-def filter_audio(src_folder, dst_folder=None, min_duration=3, max_duration=10, copy_parent_folder=False):
-    """根据音频时长过滤文件"""
+def trim_silence_segment(segment, threshold_db=-40):
+    """裁剪首尾静音，整段几乎都是静音时返回 None"""
+    samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+    samples = samples.reshape(-1, segment.channels).mean(axis=1) / (1 << (8 * segment.sample_width - 1))
+    bounds = detect_speech([samples], segment.frame_rate, threshold_db=threshold_db)[0]
+    if bounds is None:
+        return None
+    start, end = bounds
+    return segment[start * 1000 / segment.frame_rate:end * 1000 / segment.frame_rate]
+
+def filter_audio(src_folder, dst_folder=None, min_duration=3, max_duration=10, copy_parent_folder=False, trim_silence=False, silence_db=-40):
+    """根据音频时长过滤文件，启用 trim_silence 时按裁剪首尾静音后的时长过滤"""
     if not os.path.exists(src_folder):
         logging.error(f"源文件夹不存在: {src_folder}")
         return src_folder
@@ -107,9 +119,16 @@ def filter_audio(src_folder, dst_folder=None, min_duration=3, max_duration=10, c
 
         os.makedirs(os.path.dirname(dst_path), exist_ok=True)
 
-        duration = AudioSegment.from_wav(src_path).duration_seconds
+        segment = AudioSegment.from_wav(src_path)
+        if trim_silence:
+            segment = trim_silence_segment(segment, silence_db)
+            if segment is None:
+                logging.warning(f"跳过: {src_path} (几乎全部为静音)")
+                continue
+
+        duration = segment.duration_seconds
         if min_duration <= duration <= max_duration:
-            AudioSegment.from_wav(src_path).export(dst_path, format="wav")
+            segment.export(dst_path, format="wav")
             logging.info(f"已复制: {src_path} -> {dst_path}")
         else:
             logging.warning(f"跳过: {src_path} (时长: {duration:.2f}秒)")
@@ -123,6 +142,8 @@ if __name__ == "__main__":
     parser.add_argument('-dst', '--dst_folder', help='目标文件夹路径')
     parser.add_argument('-min', '--min_duration', type=float, default=3, help='最小时长(秒), 默认为3秒')
     parser.add_argument('-max', '--max_duration', type=float, default=10, help='最大时长(秒)')
+    parser.add_argument('-t', '--trim_silence', action='store_true', help='裁剪首尾静音并按裁剪后的时长筛选')
+    parser.add_argument('--silence_db', type=float, default=-40, help='静音判定阈值(dBFS), 默认为-40')
     parser.add_argument('-d', '--disable_filter', action='store_true', help='禁用音频筛选')
     parser.add_argument('-r', '--rename_method', choices=['lab', 'list'], required=True, help='重命名方式：根据.lab文件或.list文件')
 
@@ -139,7 +160,8 @@ if __name__ == "__main__":
 
     # 然后进行音频筛选
     if not args.disable_filter:
-        filter_audio(args.src_folder, args.dst_folder, args.min_duration, args.max_duration, copy_parent_folder=True)
+        filter_audio(args.src_folder, args.dst_folder, args.min_duration, args.max_duration, copy_parent_folder=True,
+                     trim_silence=args.trim_silence, silence_db=args.silence_db)
         logging.info(f"音频文件筛选完成，保存在 {args.dst_folder or args.src_folder}")
     else:
         logging.info("音频筛选已禁用")
@@ -5,19 +5,23 @@ import argparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from modelscope.pipelines import pipeline
 from modelscope.utils.constant import Tasks
-import torchaudio
 import glob
 import pandas as pd
 import torch
 import asyncio
 import gc
+from audio_pack import open_pack, load_waveform
+from silence import trim_waveforms
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class EmotionRecognitionPipeline:
-    def __init__(self, model_path="iic/emotion2vec_base_finetuned", model_revision="v2.0.4", device='cuda:0', target_sample_rate=16000):
+    def __init__(self, model_path="iic/emotion2vec_base_finetuned", model_revision="v2.0.4", device='cuda:0', target_sample_rate=16000, pack=None, trim_silence=False, silence_db=-40):
         self.device = device
         self.target_sample_rate = target_sample_rate
+        self.pack = pack
+        self.trim_silence = trim_silence
+        self.silence_db = silence_db
         self.pipeline = pipeline(
             task=Tasks.emotion_recognition,
             model=model_path,
@@ -26,28 +30,31 @@ class EmotionRecognitionPipeline:
         )
 
     async def batch_infer(self, audio_paths):
-        waveforms, sample_rates = zip(*map(torchaudio.load, audio_paths))
-        resampled_waveforms = [self._resample_waveform(waveform, sample_rate) for waveform, sample_rate in zip(waveforms, sample_rates)]
+        """返回 (识别结果, 跳过原因) 列表，被跳过的音频识别结果为 None"""
+        resampled_waveforms = [load_waveform(audio_path, self.pack, self.target_sample_rate, self.device) for audio_path in audio_paths]
+        skip_reasons = [''] * len(resampled_waveforms)
+        if self.trim_silence:
+            resampled_waveforms, skip_reasons = trim_waveforms(resampled_waveforms, self.target_sample_rate, self.silence_db)
 
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(None, self._batch_pipeline, resampled_waveforms)
-        return results
+        kept_waveforms = [waveform for waveform, reason in zip(resampled_waveforms, skip_reasons) if not reason]
+        results = []
+        if kept_waveforms:
+            loop = asyncio.get_event_loop()
+            results = await loop.run_in_executor(None, self._batch_pipeline, kept_waveforms)
+
+        results = iter(results)
+        return [(None if reason else next(results), reason) for reason in skip_reasons]
 
     def _batch_pipeline(self, resampled_waveforms):
         return self.pipeline(resampled_waveforms, sample_rate=self.target_sample_rate, granularity="utterance", extract_embedding=False)
 
-    def _resample_waveform(self, waveform, sample_rate):
-        if sample_rate != self.target_sample_rate:
-            resampler = torchaudio.transforms.Resample(orig_freq=sample_rate, new_freq=self.target_sample_rate).to(self.device)
-            waveform = resampler(waveform.to(self.device))
-        return waveform
-
 def get_top_emotion_with_confidence(recognition_results):
-    return [(result['labels'][result['scores'].index(max(result['scores']))].split('/')[0], max(result['scores'])) for result in recognition_results]
+    return [(result['labels'][result['scores'].index(max(result['scores']))].split('/')[0], max(result['scores'])) if result is not None else (None, None) for result in recognition_results]
 
 async def process_batch(batch_audio_paths, recognizer):
-    top_emotions_with_confidence = get_top_emotion_with_confidence(await recognizer.batch_infer(batch_audio_paths))
-    return [(audio_path, *top_emotion_confidence) for audio_path, top_emotion_confidence in zip(batch_audio_paths, top_emotions_with_confidence)]
+    recognition_results, skip_reasons = zip(*await recognizer.batch_infer(batch_audio_paths))
+    top_emotions_with_confidence = get_top_emotion_with_confidence(recognition_results)
+    return [(audio_path, *top_emotion_confidence, skip_reason) for audio_path, top_emotion_confidence, skip_reason in zip(batch_audio_paths, top_emotions_with_confidence, skip_reasons)]
 
 def audio_path_generator(folder_path):
     audio_paths = glob.glob(os.path.join(folder_path, '**', '*.wav'), recursive=True)
@@ -80,7 +87,7 @@ async def process_audio_files(folder_path, recognizer, batch_size=64, max_worker
 def contains_chinese(text):
     return any('\u4e00' <= char <= '\u9fff' for char in text)
 
-def process_text_emotion(df, text_classifier):
+def process_text_emotion(df, text_classifier, skip_reasons=None):
     emotion_mapping = {
         '恐惧': '恐惧',
         '愤怒': '生气', 
@@ -96,9 +103,13 @@ def process_text_emotion(df, text_classifier):
 
     texts = df['AudioPath'].apply(lambda x: os.path.splitext(os.path.basename(x))[0]).tolist()
 
+    if skip_reasons is None:
+        skip_reasons = [''] * len(texts)
+
     mapped_emotions = []
-    for text in texts:
-        if not contains_chinese(text):
+    for text, skip_reason in zip(texts, skip_reasons):
+        # 被跳过的音频不会参与分类，无需进行文本情感识别
+        if skip_reason or not contains_chinese(text):
             mapped_emotions.append('')
         else:
             chinese_text = get_chinese_text(text)
@@ -114,18 +125,23 @@ def process_text_emotion(df, text_classifier):
     return df
 
 async def main(args):
-    emotion_recognizer = EmotionRecognitionPipeline(model_revision=args.model_revision)
+    pack = open_pack(args.pack_dir) if args.pack_dir else None
+    emotion_recognizer = EmotionRecognitionPipeline(model_revision=args.model_revision, pack=pack, trim_silence=args.trim_silence, silence_db=args.silence_db)
     audio_emotion_results = await process_audio_files(args.folder_path, emotion_recognizer, args.batch_size, args.max_workers)
 
     if audio_emotion_results is None:
         return
 
-    df = pd.DataFrame(audio_emotion_results, columns=['AudioPath', 'AudioEmotion', 'Confidence'])
+    df = pd.DataFrame(audio_emotion_results, columns=['AudioPath', 'AudioEmotion', 'Confidence', 'SkipReason'])
+    skip_reasons = df.pop('SkipReason')
     df['ParentFolder'] = df['AudioPath'].apply(lambda x: os.path.basename(os.path.dirname(x)))
 
     if not args.disable_text_emotion:
         text_classifier = pipeline(Tasks.text_classification, 'model/structbert_emotion', model_revision='v1.0.0')
-        df = process_text_emotion(df, text_classifier)
+        df = process_text_emotion(df, text_classifier, skip_reasons.tolist())
+
+    if args.trim_silence:
+        df['SkipReason'] = skip_reasons
 
     output_file = args.output_file
     df.to_csv(output_file, sep='|', index=False, encoding='utf-8')
@@ -138,6 +154,9 @@ if __name__ == "__main__":
     parser.add_argument('--model_revision', type=str, default="v2.0.4", help='情感识别模型的修订版本')
     parser.add_argument('--batch_size', type=int, default=64, help='推理的批量大小')
     parser.add_argument('--max_workers', type=int, default=4, help='并行处理的最大工作线程数')
+    parser.add_argument('--pack_dir', type=str, default=None, help='audio_pack.py 生成的音频包路径')
+    parser.add_argument('--trim_silence', action='store_true', help='推理前裁剪首尾静音并跳过几乎全是静音的音频')
+    parser.add_argument('--silence_db', type=float, default=-40, help='静音判定阈值(dBFS)')
     parser.add_argument('--disable_text_emotion', action='store_true', help='是否禁用文本情感分类')
     args = parser.parse_args()
     asyncio.run(main(args))
@@ -5,7 +5,6 @@ import argparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from modelscope.pipelines import pipeline
 from modelscope.utils.constant import Tasks
-import torchaudio
 import glob
 import pandas as pd
 import torch
@@ -14,24 +13,34 @@ import gc
 import gradio as gr
 from fastapi import FastAPI
 from pydantic import BaseModel, ConfigDict
+from audio_pack import open_pack, load_waveform
+from silence import trim_waveforms
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class Config:
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-async def process_batch(batch_audio_paths, recognizer):
-    waveforms, sample_rates = zip(*[torchaudio.load(path) for path in batch_audio_paths])
-    resampled_waveforms = [torchaudio.transforms.Resample(sr, 16000)(waveform) for waveform, sr in zip(waveforms, sample_rates)]
-    results = recognizer(resampled_waveforms, sampled_rate=16000, granularity="utterance", extract_embedding=False)
+async def process_batch(batch_audio_paths, recognizer, pack=None, trim_silence=False, silence_db=-40):
+    resampled_waveforms = [load_waveform(path, pack) for path in batch_audio_paths]
+    skip_reasons = [''] * len(resampled_waveforms)
+    if trim_silence:
+        resampled_waveforms, skip_reasons = trim_waveforms(resampled_waveforms, 16000, silence_db)
+
+    kept_waveforms = [waveform for waveform, reason in zip(resampled_waveforms, skip_reasons) if not reason]
+    results = iter(recognizer(kept_waveforms, sampled_rate=16000, granularity="utterance", extract_embedding=False) if kept_waveforms else [])
     
     processed_results = []
-    for audio_path, result in zip(batch_audio_paths, results):
+    for audio_path, skip_reason in zip(batch_audio_paths, skip_reasons):
+        if skip_reason:
+            processed_results.append((audio_path, None, None, skip_reason))
+            continue
+        result = next(results)
         scores = result['scores']
         labels = result['labels']
         max_score_index = scores.index(max(scores))
         max_score_label = labels[max_score_index]
-        processed_results.append((audio_path, max_score_label, scores[max_score_index]))
+        processed_results.append((audio_path, max_score_label, scores[max_score_index], skip_reason))
     
     return processed_results
 def audio_path_generator(folder_path):
@@ -39,7 +48,7 @@ def audio_path_generator(folder_path):
     for audio_path in audio_paths:
         yield audio_path
 
-async def process_audio_files(folder_path, recognizer, batch_size=64, max_workers=4):
+async def process_audio_files(folder_path, recognizer, batch_size=64, max_workers=4, pack=None, trim_silence=False, silence_db=-40):
     if not os.path.exists(folder_path):
         logging.error(f"目录不存在：{folder_path}")
         return None
@@ -52,12 +61,12 @@ async def process_audio_files(folder_path, recognizer, batch_size=64, max_worker
         for audio_path in audio_path_generator(folder_path):
             batch.append(audio_path)
             if len(batch) == batch_size:
-                results.extend(await process_batch(batch, recognizer))
+                results.extend(await process_batch(batch, recognizer, pack, trim_silence, silence_db))
                 batch = []
                 gc.collect()  # 主动调用垃圾回收
 
         if batch:
-            results.extend(await process_batch(batch, recognizer))
+            results.extend(await process_batch(batch, recognizer, pack, trim_silence, silence_db))
 
     logging.info(f"Processed files in {folder_path}, total time: {time.time() - start_time:.2f} seconds")
     return results
@@ -68,13 +77,17 @@ async def main(args):
         model="iic/emotion2vec_plus_large"
     )
     
-    audio_emotion_results = await process_audio_files(args.folder_path, emotion_recognizer, args.batch_size, args.max_workers)
+    pack = open_pack(args.pack_dir) if args.pack_dir else None
+    audio_emotion_results = await process_audio_files(args.folder_path, emotion_recognizer, args.batch_size, args.max_workers, pack, args.trim_silence, args.silence_db)
 
     if audio_emotion_results is None:
         return
 
-    df = pd.DataFrame(audio_emotion_results, columns=['AudioPath', 'AudioEmotion', 'Confidence'])
+    df = pd.DataFrame(audio_emotion_results, columns=['AudioPath', 'AudioEmotion', 'Confidence', 'SkipReason'])
+    skip_reasons = df.pop('SkipReason')
     df['ParentFolder'] = df['AudioPath'].apply(lambda x: os.path.basename(os.path.dirname(x)))
+    if args.trim_silence:
+        df['SkipReason'] = skip_reasons
 
     output_file = args.output_file
     df.to_csv(output_file, sep='|', index=False, encoding='utf-8')
@@ -86,5 +99,8 @@ if __name__ == "__main__":
     parser.add_argument('--output_file', type=str, required=True, help='输出文件的路径')
     parser.add_argument('--batch_size', type=int, default=64, help='推理的批量大小')
     parser.add_argument('--max_workers', type=int, default=4, help='并行处理的最大工作线程数')
+    parser.add_argument('--pack_dir', type=str, default=None, help='audio_pack.py 生成的音频包路径')
+    parser.add_argument('--trim_silence', action='store_true', help='推理前裁剪首尾静音并跳过几乎全是静音的音频')
+    parser.add_argument('--silence_db', type=float, default=-40, help='静音判定阈值(dBFS)')
     args = parser.parse_args()
     asyncio.run(main(args))
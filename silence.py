@@ -0,0 +1,58 @@
+import numpy as np
+
+SILENCE_REASON = "静音"
+
+def frame_energy_db(waveforms, sample_rate, frame_ms=20):
+    """批量计算每帧能量(dBFS)，返回能量矩阵、有效帧掩码和帧长"""
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    frame_counts = np.array([max(1, -(-len(waveform) // frame_len)) for waveform in waveforms])
+    max_frames = frame_counts.max()
+
+    # 逐个片段按帧计算能量，只有帧能量矩阵按最长片段对齐，内存随总采样点数增长
+    mean_square = np.zeros((len(waveforms), max_frames), dtype=np.float32)
+    for i, waveform in enumerate(waveforms):
+        waveform = np.asarray(waveform, dtype=np.float32)
+        full_frames = len(waveform) // frame_len
+        frames = waveform[:full_frames * frame_len].reshape(full_frames, frame_len)
+        mean_square[i, :full_frames] = np.einsum('ij,ij->i', frames, frames) / frame_len
+        tail = waveform[full_frames * frame_len:]
+        if len(tail):
+            # 末尾不足一帧的部分按补零后的整帧计算
+            mean_square[i, full_frames] = np.dot(tail, tail) / frame_len
+
+    rms = np.sqrt(mean_square)
+    energy_db = 20 * np.log10(np.maximum(rms, 1e-10))
+    valid = np.arange(max_frames)[None, :] < frame_counts[:, None]
+    return energy_db, valid, frame_len
+
+def detect_speech(waveforms, sample_rate, threshold_db=-40, frame_ms=20, min_speech=0.3, pad_ms=100):
+    """检测一批单声道波形(取值范围[-1, 1])的有声区间
+
+    返回与输入一一对应的 (start, end) 采样点区间，有声时长不足 min_speech 秒的片段返回 None
+    """
+    if not waveforms:
+        return []
+
+    energy_db, valid, frame_len = frame_energy_db(waveforms, sample_rate, frame_ms)
+    voiced = (energy_db > threshold_db) & valid
+    speech_seconds = voiced.sum(axis=1) * frame_len / sample_rate
+    first = voiced.argmax(axis=1)
+    last = voiced.shape[1] - 1 - voiced[:, ::-1].argmax(axis=1)
+    pad = int(sample_rate * pad_ms / 1000)
+
+    bounds = []
+    for i, waveform in enumerate(waveforms):
+        if speech_seconds[i] < min_speech:
+            bounds.append(None)
+            continue
+        start = max(0, first[i] * frame_len - pad)
+        end = min(len(waveform), (last[i] + 1) * frame_len + pad)
+        bounds.append((int(start), int(end)))
+    return bounds
+
+def trim_waveforms(waveforms, sample_rate, threshold_db=-40):
+    """裁剪一批形状为 (C, N) 的 torch 波形的首尾静音，返回 (裁剪后的波形, 跳过原因)"""
+    bounds = detect_speech([waveform.mean(dim=0).cpu().numpy() for waveform in waveforms], sample_rate, threshold_db=threshold_db)
+    trimmed_waveforms = [waveform if bound is None else waveform[..., bound[0]:bound[1]] for waveform, bound in zip(waveforms, bounds)]
+    skip_reasons = [SILENCE_REASON if bound is None else '' for bound in bounds]
+    return trimmed_waveforms, skip_reasons
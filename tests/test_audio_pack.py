@@ -0,0 +1,162 @@
+import os
+import sys
+import wave
+import pytest
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+torchaudio = pytest.importorskip("torchaudio")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_pack import AudioPack, open_pack, load_waveform
+
+# float16 下超过 1MB，保证每个文件单独占一个分片
+NUM_SAMPLES = 600_000
+
+def write_clip(folder, name, value):
+    path = os.path.join(folder, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(str(value))
+    return path
+
+def write_wav(folder, name, sample_rate=44100, seconds=1.0):
+    # 左右声道幅度不同的正弦波，用于检查两条读取路径的声道处理是否一致
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    tone = np.sin(2 * np.pi * 440 * t)
+    stereo = np.stack([0.5 * tone, 0.25 * tone], axis=1)
+    path = os.path.join(folder, name)
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes((stereo * 32767).astype('<i2').tobytes())
+    return path
+
+def make_pack(pack_dir, monkeypatch, shard_size_mb=1):
+    # 用文件内容作为采样值，避免依赖真实的 wav 解码
+    def fake_decode(self, audio_path):
+        with open(audio_path, 'r', encoding='utf-8') as f:
+            value = float(f.read())
+        return np.full(NUM_SAMPLES, value, dtype=self.dtype)
+
+    monkeypatch.setattr(AudioPack, "_decode", fake_decode)
+    return AudioPack(pack_dir, shard_size_mb=shard_size_mb)
+
+def assert_clip(pack, path, value):
+    waveform = pack.load(path)
+    assert waveform is not None
+    assert waveform.shape == (1, NUM_SAMPLES)
+    assert (waveform == value).all()
+
+def test_new_shard_does_not_overwrite_live_shard(tmp_path, monkeypatch):
+    folder = str(tmp_path / "input")
+    pack_dir = str(tmp_path / "pack")
+    os.makedirs(folder)
+
+    clip_a = write_clip(folder, "a.wav", 1)
+    clip_b = write_clip(folder, "b.wav", 2)
+    make_pack(pack_dir, monkeypatch).update(folder)
+
+    os.remove(clip_a)
+    make_pack(pack_dir, monkeypatch).update(folder)
+
+    clip_c = write_clip(folder, "c.wav", 3)
+    pack = make_pack(pack_dir, monkeypatch)
+    pack.update(folder)
+
+    assert len(set(pack.shards)) == len(pack.shards) == 2
+    assert_clip(make_pack(pack_dir, monkeypatch), clip_b, 2)
+    assert_clip(make_pack(pack_dir, monkeypatch), clip_c, 3)
+
+def test_changed_files_are_compacted(tmp_path, monkeypatch):
+    folder = str(tmp_path / "input")
+    pack_dir = str(tmp_path / "pack")
+    os.makedirs(folder)
+
+    clip_a = write_clip(folder, "a.wav", 1)
+    clip_b = write_clip(folder, "b.wav", 2)
+    clip_c = write_clip(folder, "c.wav", 3)
+    make_pack(pack_dir, monkeypatch, shard_size_mb=64).update(folder)
+    shard_size = os.path.getsize(os.path.join(pack_dir, "shard_00000.bin"))
+
+    # 三个文件中两个被修改，原分片失效数据占比超过一半，应被重写
+    write_clip(folder, "a.wav", 10)
+    write_clip(folder, "b.wav", 20)
+    make_pack(pack_dir, monkeypatch, shard_size_mb=64).update(folder)
+
+    pack = make_pack(pack_dir, monkeypatch, shard_size_mb=64)
+    assert "shard_00000.bin" not in pack.shards
+    assert sum(os.path.getsize(os.path.join(pack_dir, name)) for name in pack.shards) == shard_size
+    assert_clip(pack, clip_a, 10)
+    assert_clip(pack, clip_b, 20)
+    assert_clip(pack, clip_c, 3)
+
+def test_dtype_mismatch_raises(tmp_path, monkeypatch):
+    folder = str(tmp_path / "input")
+    pack_dir = str(tmp_path / "pack")
+    os.makedirs(folder)
+
+    write_clip(folder, "a.wav", 1)
+    make_pack(pack_dir, monkeypatch).update(folder)
+
+    with pytest.raises(ValueError):
+        AudioPack(pack_dir, dtype="int16")
+    assert AudioPack(pack_dir).dtype == "float16"
+
+def test_missing_shard_is_repacked(tmp_path, monkeypatch):
+    folder = str(tmp_path / "input")
+    pack_dir = str(tmp_path / "pack")
+    os.makedirs(folder)
+
+    clip_a = write_clip(folder, "a.wav", 1)
+    clip_b = write_clip(folder, "b.wav", 2)
+    make_pack(pack_dir, monkeypatch).update(folder)
+
+    os.remove(os.path.join(pack_dir, make_pack(pack_dir, monkeypatch).entries[AudioPack._key(clip_a)]["shard"]))
+    make_pack(pack_dir, monkeypatch).update(folder)
+
+    pack = make_pack(pack_dir, monkeypatch)
+    assert all(os.path.exists(os.path.join(pack_dir, name)) for name in pack.shards)
+    assert_clip(pack, clip_a, 1)
+    assert_clip(pack, clip_b, 2)
+
+def test_int16_pack_matches_decode_and_resample(tmp_path):
+    folder = str(tmp_path / "input")
+    pack_dir = str(tmp_path / "pack")
+    os.makedirs(folder)
+
+    clip = write_wav(folder, "tone.wav")
+    AudioPack(pack_dir, dtype="int16").update(folder)
+
+    waveform, sample_rate = torchaudio.load(clip)
+    expected = torchaudio.functional.resample(waveform.mean(dim=0, keepdim=True), sample_rate, 16000)
+
+    packed = open_pack(pack_dir).load(clip)
+    assert packed.dtype == torch.float32
+    assert packed.shape == expected.shape
+    assert torch.allclose(packed, expected, atol=1e-3)
+
+    decoded = load_waveform(clip)
+    assert decoded.shape == expected.shape
+    assert torch.allclose(decoded, packed, atol=1e-3)
+
+def test_load_falls_back_after_file_change(tmp_path):
+    folder = str(tmp_path / "input")
+    pack_dir = str(tmp_path / "pack")
+    os.makedirs(folder)
+
+    clip = write_wav(folder, "tone.wav")
+    AudioPack(pack_dir).update(folder)
+
+    stat = os.stat(clip)
+    os.utime(clip, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    pack = open_pack(pack_dir)
+    assert pack.load(clip) is None
+    waveform = load_waveform(clip, pack)
+    assert waveform.shape == (1, 16000)
+
+def test_open_pack_requires_index(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        open_pack(str(tmp_path / "missing"))
@@ -0,0 +1,114 @@
+import os
+import sys
+import asyncio
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from silence import detect_speech, trim_waveforms, SILENCE_REASON
+
+SAMPLE_RATE = 16000
+FRAME_LEN = 320  # 默认 20ms 帧长
+PAD = 1600  # 默认 100ms 边缘保留
+
+def tone_in_silence(length, tone_start, tone_end, amplitude=0.5):
+    waveform = np.zeros(length, dtype=np.float32)
+    t = np.arange(tone_end - tone_start) / SAMPLE_RATE
+    waveform[tone_start:tone_end] = amplitude * np.sin(2 * np.pi * 440 * t)
+    return waveform
+
+def test_all_zero_clip_is_silent():
+    assert detect_speech([np.zeros(SAMPLE_RATE, dtype=np.float32)], SAMPLE_RATE) == [None]
+
+def test_tone_bounds_within_one_frame_plus_pad():
+    tone_start, tone_end = 8050, 24130
+    start, end = detect_speech([tone_in_silence(40000, tone_start, tone_end)], SAMPLE_RATE)[0]
+
+    assert tone_start - PAD - FRAME_LEN <= start <= tone_start - PAD
+    assert tone_end + PAD <= end <= tone_end + PAD + FRAME_LEN
+
+def test_pad_is_clamped_to_clip_edges():
+    waveform = tone_in_silence(20000, 0, 20000)
+    assert detect_speech([waveform], SAMPLE_RATE)[0] == (0, 20000)
+
+def test_short_speech_is_gated_by_min_speech():
+    waveform = tone_in_silence(SAMPLE_RATE * 2, 8000, 9600)  # 0.1 秒
+    assert detect_speech([waveform], SAMPLE_RATE) == [None]
+    assert detect_speech([waveform], SAMPLE_RATE, min_speech=0.05)[0] is not None
+
+def test_batch_matches_individual_clips():
+    clips = [
+        tone_in_silence(20011, 5000, 15000),
+        tone_in_silence(81234, 30000, 70000),
+        np.zeros(12345, dtype=np.float32),
+    ]
+    batched = detect_speech(clips, SAMPLE_RATE)
+    assert batched == [detect_speech([clip], SAMPLE_RATE)[0] for clip in clips]
+    assert batched[2] is None
+
+def test_trim_waveforms_keeps_positions():
+    torch = pytest.importorskip("torch")
+    clips = [
+        tone_in_silence(40000, 8000, 24000),
+        np.zeros(20000, dtype=np.float32),
+    ]
+    waveforms = [torch.from_numpy(np.stack([clip, clip])) for clip in clips]
+
+    trimmed, skip_reasons = trim_waveforms(waveforms, SAMPLE_RATE)
+
+    start, end = detect_speech(clips, SAMPLE_RATE)[0]
+    assert trimmed[0].shape == (2, end - start)
+    assert skip_reasons == ['', SILENCE_REASON]
+
+def test_batch_infer_reinterleaves_skipped_clips(monkeypatch):
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("torchaudio")
+    pytest.importorskip("modelscope")
+    pytest.importorskip("pandas")
+    import recognize
+
+    waveforms = {
+        "speech_a.wav": tone_in_silence(40000, 8000, 24000),
+        "silent_b.wav": np.zeros(20000, dtype=np.float32),
+        "speech_c.wav": tone_in_silence(30000, 4000, 26000),
+        "silent_d.wav": np.zeros(10000, dtype=np.float32),
+    }
+    monkeypatch.setattr(recognize, "load_waveform", lambda audio_path, *args: torch.from_numpy(waveforms[audio_path]).unsqueeze(0))
+
+    recognizer = object.__new__(recognize.EmotionRecognitionPipeline)
+    recognizer.device = 'cpu'
+    recognizer.target_sample_rate = SAMPLE_RATE
+    recognizer.pack = None
+    recognizer.trim_silence = True
+    recognizer.silence_db = -40
+    received = []
+
+    def stub_pipeline(kept_waveforms, **kwargs):
+        received.extend(kept_waveforms)
+        return [{"length": waveform.shape[-1]} for waveform in kept_waveforms]
+
+    recognizer.pipeline = stub_pipeline
+
+    results = asyncio.run(recognizer.batch_infer(list(waveforms)))
+
+    assert len(received) == 2
+    assert results[1] == (None, SILENCE_REASON)
+    assert results[3] == (None, SILENCE_REASON)
+    assert results[0] == ({"length": received[0].shape[-1]}, '')
+    assert results[2] == ({"length": received[1].shape[-1]}, '')
+    assert received[0].shape[-1] < 40000 and received[1].shape[-1] < 30000
+
+def test_trim_silence_segment():
+    pydub = pytest.importorskip("pydub")
+    from preprocess_audio import trim_silence_segment
+
+    def make_segment(samples):
+        return pydub.AudioSegment(data=(samples * 32767).astype('<i2').tobytes(), sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+
+    trimmed = trim_silence_segment(make_segment(tone_in_silence(SAMPLE_RATE * 3, SAMPLE_RATE, SAMPLE_RATE * 2)))
+    # 1 秒有声部分加两侧各 100ms 边缘，允许一帧误差
+    assert 1.2 <= trimmed.duration_seconds <= 1.2 + 2 * FRAME_LEN / SAMPLE_RATE
+
+    assert trim_silence_segment(make_segment(np.zeros(SAMPLE_RATE, dtype=np.float32))) is None
@@ -30,6 +30,7 @@ CLASSIFY_OUTPUT_FOLDER = "output"
 
 MIN_DURATION = 3
 MAX_DURATION = 10
+SILENCE_DB = -40
 
 BATCH_SIZE = 50
 MAX_WORKERS = 4
@@ -43,7 +44,7 @@ def create_folders(folders):
     for folder in folders:
         os.makedirs(folder, exist_ok=True)
 
-async def preprocess_and_rename_audio(input_folder, output_folder, min_duration, max_duration, disable_filter, rename_method, list_file=None):
+async def preprocess_and_rename_audio(input_folder, output_folder, min_duration, max_duration, disable_filter, rename_method, list_file=None, trim_silence=False):
     src_items = len(os.listdir(input_folder))
     copy_parent_folder = src_items > 5
 
@@ -65,7 +66,8 @@ async def preprocess_and_rename_audio(input_folder, output_folder, min_duration,
         filter_result = "跳过音频过滤步骤。"
         audio_folder = input_folder
     else:
-        filter_audio(input_folder, output_folder, min_duration, max_duration, copy_parent_folder=copy_parent_folder)
+        filter_audio(input_folder, output_folder, min_duration, max_duration, copy_parent_folder=copy_parent_folder,
+                     trim_silence=trim_silence, silence_db=SILENCE_DB)
         filter_result = f"音频过滤完成,结果保存在 {output_folder} 文件夹中。"
         audio_folder = output_folder
 
@@ -79,7 +81,10 @@ async def recognize_audio_emotions(audio_folder, batch_size, max_workers, output
             batch_size=batch_size,
             max_workers=max_workers,
             disable_text_emotion=True,
-            model_revision=MODEL_REVISION
+            model_revision=MODEL_REVISION,
+            pack_dir=None,
+            trim_silence=False,
+            silence_db=SILENCE_DB
         )
         await recognize_main(recognize_args)
     else:
@@ -87,7 +92,10 @@ async def recognize_audio_emotions(audio_folder, batch_size, max_workers, output
             folder_path=audio_folder,
             output_file=output_file,
             batch_size=batch_size,
-            max_workers=max_workers
+            max_workers=max_workers,
+            pack_dir=None,
+            trim_silence=False,
+            silence_db=SILENCE_DB
         )
         await recognizev2_main(recognizev2_args)
 
@@ -97,8 +105,8 @@ async def classify_audio_emotions(log_file, max_workers, output_folder):
     await classify_audio_emotion(log_file, output_folder, max_workers)
     return f"音频情感分类完成,结果保存在 {output_folder} 文件夹中。"
 
-async def run_end_to_end_pipeline(input_folder, min_duration, max_duration, batch_size, max_workers, disable_filter, rename_method, model_name, list_file=None):
-    preprocess_result, audio_folder = await preprocess_and_rename_audio(input_folder, PREPROCESS_OUTPUT_FOLDER, min_duration, max_duration, disable_filter, rename_method, list_file)
+async def run_end_to_end_pipeline(input_folder, min_duration, max_duration, batch_size, max_workers, disable_filter, rename_method, model_name, list_file=None, trim_silence=False):
+    preprocess_result, audio_folder = await preprocess_and_rename_audio(input_folder, PREPROCESS_OUTPUT_FOLDER, min_duration, max_duration, disable_filter, rename_method, list_file, trim_silence)
     output_file = os.path.join(CSV_OUTPUT_FOLDER, "recognition_result.csv")
     recognize_result = await recognize_audio_emotions(audio_folder, batch_size, max_workers, output_file, model_name)
     classify_result = await classify_audio_emotions(output_file, max_workers, CLASSIFY_OUTPUT_FOLDER)
@@ -133,6 +141,7 @@ async def launch_ui():
                     one_click_min_duration = gr.Number(value=MIN_DURATION, label="最小时长(秒)")
                     one_click_max_duration = gr.Number(value=MAX_DURATION, label="最大时长(秒)")
                     one_click_disable_filter = gr.Checkbox(value=False, label="禁用参考音频筛选")
+                    one_click_trim_silence = gr.Checkbox(value=False, label="裁剪首尾静音")
                 with gr.Column():
                     one_click_batch_size = gr.Slider(1, 100, value=BATCH_SIZE, step=1, label="批量大小")
                     one_click_max_workers = gr.Slider(1, 16, value=MAX_WORKERS, step=1, label="最大工作线程数") 
@@ -153,10 +162,10 @@ async def launch_ui():
             
             one_click_result = gr.Textbox(label="推理结果", lines=5)
 
-            async def run_pipeline(input_folder, min_duration, max_duration, batch_size, max_workers, disable_filter, rename_method, model_name, list_file):
-                return await run_end_to_end_pipeline(input_folder, min_duration, max_duration, batch_size, max_workers, disable_filter, rename_method, model_name, list_file)
+            async def run_pipeline(input_folder, min_duration, max_duration, batch_size, max_workers, disable_filter, rename_method, model_name, list_file, trim_silence):
+                return await run_end_to_end_pipeline(input_folder, min_duration, max_duration, batch_size, max_workers, disable_filter, rename_method, model_name, list_file, trim_silence)
 
-            one_click_button.click(run_pipeline, inputs=[one_click_input_folder, one_click_min_duration, one_click_max_duration, one_click_batch_size, one_click_max_workers, one_click_disable_filter, one_click_rename_method, one_click_model_name, one_click_list_file], outputs=one_click_result)
+            one_click_button.click(run_pipeline, inputs=[one_click_input_folder, one_click_min_duration, one_click_max_duration, one_click_batch_size, one_click_max_workers, one_click_disable_filter, one_click_rename_method, one_click_model_name, one_click_list_file, one_click_trim_silence], outputs=one_click_result)
             one_click_reset_button.click(reset_folders, [], one_click_result)
 
         with gr.Tab("音频预处理"):
@@ -168,6 +177,7 @@ async def launch_ui():
                 preprocess_min_duration = gr.Number(value=MIN_DURATION, label="最小时长(秒)")  
                 preprocess_max_duration = gr.Number(value=MAX_DURATION, label="最大时长(秒)")
                 preprocess_disable_filter = gr.Checkbox(value=False, label="禁用参考音频筛选")
+                preprocess_trim_silence = gr.Checkbox(value=False, label="裁剪首尾静音")
 
             with gr.Row():
                 preprocess_rename_method = gr.Radio(["lab", "list"], label="音频重命名方式", value="lab")
@@ -181,7 +191,7 @@ async def launch_ui():
             preprocess_button = gr.Button("开始预处理", variant="primary")
             preprocess_result = gr.Textbox(label="预处理结果", lines=3)
 
-            preprocess_button.click(preprocess_and_rename_audio, [preprocess_input_folder, preprocess_output_folder, preprocess_min_duration, preprocess_max_duration, preprocess_disable_filter, preprocess_rename_method, preprocess_list_file], preprocess_result)
+            preprocess_button.click(preprocess_and_rename_audio, [preprocess_input_folder, preprocess_output_folder, preprocess_min_duration, preprocess_max_duration, preprocess_disable_filter, preprocess_rename_method, preprocess_list_file, preprocess_trim_silence], preprocess_result)
 
         with gr.Tab("音频情感识别"):    
             with gr.Row():